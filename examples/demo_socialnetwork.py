@@ -7,6 +7,9 @@ Shows how to create profiles, add friendships, update profiles,
 and generate friend suggestions.
 """
 
+import logging
+import sys
+
 from modules.socialnetwork import SocialNetwork
 from modules.userprofile import UserProfile
 
@@ -18,6 +21,8 @@ def print_header(title: str) -> None:
 
 
 def main() -> None:
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("modules.socialnetwork").setLevel(logging.DEBUG)
     net = SocialNetwork()
 
     print_header("1. Creating Profiles")
@@ -2,10 +2,16 @@
 file:main.py
 Author: Alexandra Yakovleva
 """
-from modules.socialnetwork import SocialNetwork
+import logging
+import sys
+
+from modules.socialnetwork import ProfileExistsError, SocialNetwork
 
 def main() -> None:
     """Simple text menu to exercise the SocialNetwork class (ID-based)."""
+    # show SocialNetwork's CRUD feedback messages in the console
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("modules.socialnetwork").setLevel(logging.DEBUG)
     net = SocialNetwork()
 
     MENU = """
@@ -34,8 +40,11 @@ def main() -> None:
             name = input("Name: ").strip()
             email = input("Email (optional): ").strip()
             phone = input("Phone (optional): ").strip()
-            profile = net.add_profile(name, email, phone)
-            if profile is not None:
+            try:
+                profile = net.add_profile(name, email, phone)
+            except ProfileExistsError as error:
+                print(error)
+            else:
                 print(f"Created profile with id={profile.user_id}.")
             print()
 
@@ -62,12 +71,15 @@ def main() -> None:
             new_email = input("New email (leave blank to keep): ").strip()
             new_phone = input("New phone (leave blank to keep): ").strip()
 
-            net.update_profile(
-                user_id=user_id,
-                new_name=new_name or None,
-                new_email=new_email or None,
-                new_phone=new_phone or None,
-            )
+            try:
+                net.update_profile(
+                    user_id=user_id,
+                    new_name=new_name or None,
+                    new_email=new_email or None,
+                    new_phone=new_phone or None,
+                )
+            except ProfileExistsError as error:
+                print(error)
             print()
 
         elif choice == "5":
@@ -95,7 +107,10 @@ def main() -> None:
             if p1 is None or p2 is None:
                 print("Both IDs must exist.")
             else:
-                net.add_friendship(p1, p2)
+                try:
+                    net.add_friendship(p1, p2)
+                except ValueError as error:
+                    print(error)
             print()
 
         elif choice == "7":
@@ -112,7 +127,10 @@ def main() -> None:
             if p1 is None or p2 is None:
                 print("Both IDs must exist.")
             else:
-                net.remove_friendship(p1, p2)
+                try:
+                    net.remove_friendship(p1, p2)
+                except ValueError as error:
+                    print(error)
             print()
 
         elif choice == "8":
@@ -0,0 +1,191 @@
+"""
+File: fofkernel.py
+Author: Alexandra Yakovleva
+
+Friends-of-friends scoring over the CSR adjacency of a SocialNetwork.
+
+The CSR snapshot stores the friends of user u as
+indices[indptr[u]:indptr[u + 1]]. count_friends_of_friends() counts, for
+every friend-of-friend of a user, how many mutual friends they share.
+
+If Numba is installed, the counting loop is compiled with @njit and runs
+over the array buffers directly. Otherwise a pure-Python fallback based on
+collections.Counter is used, which keeps the counting in C as far as
+CPython allows.
+
+Small dense networks can also be scored from bitset rows (one Python int
+per user, bit v set for each friend v): see build_bitset_rows() and
+count_friends_of_friends_bitset().
+"""
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional
+    njit = None
+
+
+def _count_fof_loops(indptr, indices, user_id, expanded, scores, touched) -> int:
+    """
+    Sparse bincount of the CSR rows of the expanded friends of user_id.
+
+    scores must be zero-filled with one slot per user ID. user_id and its
+    direct friends are marked with -1 so they are never counted. Each
+    newly counted ID is appended to touched; the number of touched IDs is
+    returned. Written with plain loops so that Numba can compile it.
+    """
+    scores[user_id] = -1
+    for i in range(indptr[user_id], indptr[user_id + 1]):
+        scores[indices[i]] = -1
+
+    count = 0
+    for i in range(len(expanded)):
+        fid = expanded[i]
+        for j in range(indptr[fid], indptr[fid + 1]):
+            fof_id = indices[j]
+            score = scores[fof_id]
+            if score >= 0:
+                if score == 0:
+                    touched[count] = fof_id
+                    count += 1
+                scores[fof_id] = score + 1
+    return count
+
+
+_count_fof_jit = None if njit is None else njit(cache=True, nogil=True)(_count_fof_loops)
+
+
+def _count_rows(rows: Iterable[Sequence[int]], user_id: int, friends: Sequence[int]) -> Dict[int, int]:
+    """
+    Counter over the expanded friends' rows, minus user_id and its direct
+    friends. Shared by the CSR fallback and the adjacency kernel.
+    """
+    scores: Counter[int] = Counter(chain.from_iterable(rows))
+
+    # drop self and people who are already friends
+    scores.pop(user_id, None)
+    for fid in friends:
+        scores.pop(fid, None)
+    return scores
+
+
+def _count_fof_python(indptr, indices, user_id, expanded) -> Dict[int, int]:
+    """Counter-based fallback used when Numba is not available."""
+    return _count_rows(
+        (indices[indptr[fid]:indptr[fid + 1]] for fid in expanded),
+        user_id,
+        indices[indptr[user_id]:indptr[user_id + 1]],
+    )
+
+
+def count_friends_of_friends_adjacency(
+        adjacency: Mapping[int, Sequence[int]],
+        user_id: int,
+        expanded: Optional[Sequence[int]] = None,
+) -> Dict[int, int]:
+    """
+    Same result as count_friends_of_friends(), read from an adjacency
+    mapping of ID -> friend IDs instead of a CSR snapshot, so it can serve
+    while the snapshot is stale.
+    """
+    friends = adjacency[user_id]
+    if expanded is None:
+        expanded = friends
+    return _count_rows((adjacency[fid] for fid in expanded), user_id, friends)
+
+
+def count_friends_of_friends(
+        indptr: array,
+        indices: array,
+        user_id: int,
+        expanded: Optional[Sequence[int]] = None,
+) -> Dict[int, int]:
+    """
+    Return {candidate ID: mutual friend count} for user_id.
+    Only the friends in expanded are walked (all friends if None); self
+    and direct friends are never returned as candidates.
+    """
+    if expanded is None:
+        expanded = indices[indptr[user_id]:indptr[user_id + 1]]
+
+    if _count_fof_jit is None:
+        return _count_fof_python(indptr, indices, user_id, expanded)
+
+    n = len(indptr) - 1
+    scores = array("l", bytes(array("l").itemsize * n))
+    touched = array("l", bytes(array("l").itemsize * n))
+    count = _count_fof_jit(indptr, indices, user_id, array("i", expanded), scores, touched)
+    return {touched[i]: scores[touched[i]] for i in range(count)}
+
+
+# Bitset rows pay off only while a row is a few machine words and most of
+# them are in use: at most this many users ...
+BITSET_MAX_USERS = 4096
+# ... and at least this fraction of all friendship slots filled
+BITSET_MIN_DENSITY = 1 / 8
+
+
+def wants_bitset(n: int, nnz: int) -> bool:
+    """
+    Is a snapshot of n users and nnz friend entries small and dense enough
+    for bitset scoring? Always False with Numba, whose compiled CSR loop is
+    faster still.
+    """
+    if _count_fof_jit is not None:
+        return False
+    return 0 < n <= BITSET_MAX_USERS and nnz >= n * n * BITSET_MIN_DENSITY
+
+
+def wants_snapshot(n: int, nnz: int) -> bool:
+    """
+    Would scoring a snapshot of n users and nnz friend entries use a
+    snapshot-only kernel (Numba or bitset)? If not, the CSR path runs the
+    same Counter loop as count_friends_of_friends_adjacency(), so building
+    the snapshot gains nothing.
+    """
+    return _count_fof_jit is not None or wants_bitset(n, nnz)
+
+
+def build_bitset_rows(indptr: array, indices: array) -> List[int]:
+    """Return one int per user ID with bit v set for every friend v."""
+    n = len(indptr) - 1
+    rows = []
+    for user_id in range(n):
+        row = bytearray((n + 7) >> 3)
+        for i in range(indptr[user_id], indptr[user_id + 1]):
+            fid = indices[i]
+            row[fid >> 3] |= 1 << (fid & 7)
+        rows.append(int.from_bytes(row, "little"))
+    return rows
+
+
+def count_friends_of_friends_bitset(
+        rows: Sequence[int],
+        user_id: int,
+        expanded: Sequence[int],
+) -> Dict[int, int]:
+    """
+    Same result as count_friends_of_friends(), computed from bitset rows
+    for the friends in expanded: candidates are the OR of their rows minus
+    self and direct friends, and each score is one AND plus a popcount.
+    """
+    expanded_mask = 0
+    for fid in expanded:
+        expanded_mask |= 1 << fid
+
+    reach = 0
+    for fid in expanded:
+        reach |= rows[fid]
+    reach &= ~(rows[user_id] | 1 << user_id)
+
+    # walk the set bits of reach (lowest first) through its binary string
+    bits = format(reach, "b")[::-1]
+    scores = {}
+    fof_id = bits.find("1")
+    while fof_id >= 0:
+        scores[fof_id] = (rows[fof_id] & expanded_mask).bit_count()
+        fof_id = bits.find("1", fof_id + 1)
+    return scores
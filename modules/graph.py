@@ -2,7 +2,7 @@
 File: graph.py
 """
 
-from abstractcollection import AbstractCollection
+from .abstractcollection import AbstractCollection
 
 class LinkedEdge(object):
 
@@ -5,25 +5,60 @@ Author: Alexandra Yakovleva
 DESCRIPTION: A simple social networking system implemented using a graph structure.
 
 Class Variables:
-    _graph: LinkedDirectedGraph
-        The underlying graph storing user IDs as vertices and
-        friendships as directed edges between those IDs.
-
     _profiles: Dict[int, UserProfile]
         Maps each internal user ID to its corresponding UserProfile object.
-        Allows multiple users to share the same name.
-
-    _name_index: Dict[str, Set[int]]
-        Maps a name (e.g., "Alex") to a set of user IDs for all profiles
-        that share that name.
-
-    _profile_set: Set[UserProfile]
-        A hash-based set of all profile objects, used to detect
-        exact duplicates (same name, email, and phone).
-
-    _friendships: Dict[int, Set[int]]
-        Adjacency structure mapping each user ID to the set of IDs
-        representing that user's friends.
+        Allows multiple users to share the same name. IDs are only ever
+        appended in increasing order and deletion keeps the order of the
+        remaining keys, so iteration order is always ascending ID order.
+
+    _name_index: Dict[str, Union[int, Tuple[int, ...]]]
+        Maps a name (e.g., "Alex") to the user ID of the only profile with
+        that name, or to a tuple of user IDs once several profiles share it.
+        Most names are unique, so most entries cost no container at all.
+
+    _profile_by_key: Dict[UserProfile, UserProfile]
+        Maps every stored profile to itself. Profiles hash and compare by
+        (name, email, phone), so this detects exact duplicates like a set
+        and also returns the stored instance for equal data in O(1).
+
+    _friendships: Dict[int, array[int]]
+        Adjacency structure mapping each user ID to a sorted array of the
+        IDs representing that user's friends. Membership uses binary search;
+        a compact array costs far less memory than a set per user.
+
+    _indptr: array[int]
+    _indices: array[int]
+        Compressed sparse row (CSR) snapshot of _friendships. The sorted
+        friend IDs of user u are _indices[_indptr[u]:_indptr[u + 1]].
+
+    _dirty: bool
+        True when _friendships has changed since the CSR snapshot was built.
+
+    _pending: int
+        Number of adjacency edits since the CSR snapshot was built. While it
+        stays small, suggest_friends scores straight from _friendships rather
+        than paying for a full O(V + E) rebuild after every single edit.
+
+    _nnz: int
+        Total number of friend entries in _friendships (two per friendship).
+        Tells, without a rebuild, whether the network is dense enough for a
+        snapshot-only kernel; without one, suggestions always come from
+        _friendships and the snapshot is only built by freeze().
+
+    _bitset_rows: Optional[List[int]]
+        Bitset form of the CSR snapshot (bit v of row u set if v is a friend
+        of u), built with it only for small dense networks, where scoring
+        friends-of-friends by OR/AND/popcount beats walking the rows.
+
+    _graph: Optional[LinkedDirectedGraph]
+        LinkedDirectedGraph view with user IDs as vertices and friendships as
+        two directed edges. Derived from _friendships on first access after a
+        change, so the CRUD methods never touch it.
+
+    _suggest_cache: Dict[int, Tuple[int, ...]]
+        Maps a user ID to the ranked IDs of its last full suggest_friends
+        call. The whole cache is cleared on every mutation, so any entry
+        present is current and no ranking of a removed user is kept.
 
     _next_id: int
         An auto-incrementing integer used to assign unique user IDs
@@ -37,38 +72,88 @@ Class Variables:
 
     Notes:
         - Friendships are undirected but stored internally as two directed edges.
+        - suggest_friends reads the CSR snapshot, which is rebuilt lazily once
+          enough mutations have piled up and a Numba or bitset kernel would
+          use it; otherwise it reads _friendships.
         - Profile hashing and equality allow efficient membership tests and duplicate checks.
 
 """
 
 
 from __future__ import annotations
-from typing import Optional, List, Tuple, Set, Dict
-
+import heapq
+import logging
+import random
+import sys
+from array import array
+from bisect import bisect_left, insort
+from typing import Optional, List, Tuple, Dict, Iterable, KeysView, Union
+
+from .fofkernel import (
+    build_bitset_rows,
+    count_friends_of_friends,
+    count_friends_of_friends_adjacency,
+    count_friends_of_friends_bitset,
+    wants_bitset,
+    wants_snapshot,
+)
 from .graph import LinkedDirectedGraph
 from .userprofile import UserProfile
 
+_log = logging.getLogger(__name__)
+
+# Shared read-only default for missing adjacency entries
+_EMPTY: frozenset = frozenset()
+
+
+class ProfileExistsError(ValueError):
+    """Raised when a profile with the same name, email and phone already exists."""
+
 
 class SocialNetwork:
     """Maintains profiles and friendships using a graph."""
 
+    __slots__ = (
+        "_profiles", "_name_index", "_profile_by_key", "_friendships",
+        "_indptr", "_indices", "_dirty", "_pending", "_nnz", "_bitset_rows", "_graph",
+        "_suggest_cache", "_next_id",
+    )
+
     def __init__(self) -> None:
-        # Underlying directed graph
-        self._graph: LinkedDirectedGraph = LinkedDirectedGraph()
         # Map profile ID -> Profile object
         self._profiles: Dict[int, UserProfile] = {}
-        # Map name to set of ids
-        self._name_index: Dict[str, Set[int]] = {}
-        # Hash-based set of all profiles for duplicate check
-        self._profile_set: Set[UserProfile] = set()
+        # Map name to an id, or a tuple of ids for shared names
+        self._name_index: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        # Hash-based self-map of all profiles for duplicate check and lookup
+        self._profile_by_key: Dict[UserProfile, UserProfile] = {}
         # Separate adjacency structure
-        self._friendships: Dict[int, Set[int]] = {}  # ID -> set of friend IDs
+        self._friendships: Dict[int, array] = {}  # ID -> sorted array of friend IDs
+        # CSR snapshot of _friendships used by suggest_friends
+        self._indptr: array = array("l", [0])
+        self._indices: array = array("i")
+        self._dirty: bool = False
+        self._pending: int = 0
+        self._nnz: int = 0
+        self._bitset_rows: Optional[List[int]] = None
+        # LinkedDirectedGraph view, built on first access after a change
+        self._graph: Optional[LinkedDirectedGraph] = None
+        # suggest_friends memo: ID -> ranked IDs, cleared on every mutation
+        self._suggest_cache: Dict[int, Tuple[int, ...]] = {}
         self._next_id: int = 1 # auto-increment next ID when adding a profile
 
     # ------------- PROPERTIES -------------
 
     @property
     def graph(self) -> LinkedDirectedGraph:
+        """LinkedDirectedGraph view of the network (IDs as vertices), rebuilt lazily."""
+        if self._graph is None:
+            graph = LinkedDirectedGraph()
+            for user_id in self._profiles:
+                graph.addVertex(user_id)
+            for user_id, friend_ids in self._friendships.items():
+                for friend_id in friend_ids:
+                    graph.addEdge(user_id, friend_id, 1)
+            self._graph = graph
         return self._graph
 
     @property
@@ -76,94 +161,228 @@ class SocialNetwork:
         return self._profiles
 
     @property
-    def friendships(self) -> Dict[int, Set[int]]:
+    def friendships(self) -> Dict[int, array]:
         return self._friendships
 
     @property
-    def profile_set(self) -> Set[UserProfile]:
-        return self._profile_set
+    def profile_set(self) -> KeysView[UserProfile]:
+        """Set-like view of all stored profiles."""
+        return self._profile_by_key.keys()
+
+    @property
+    def size(self) -> int:
+        """Number of stored profiles (checks that the profile maps agree)."""
+        assert len(self._profile_by_key) == len(self._profiles), "profile maps out of sync"
+        return len(self._profiles)
 
     # ---------- Helpers ----------
 
+    def _rebuild(self) -> None:
+        """Rebuild the CSR snapshot from _friendships (rows sorted by ID)."""
+        n = self._next_id
+        indptr = array("l", [0]) * (n + 1)
+        indices = array("i")
+        friendships = self._friendships
+        for user_id in range(n):
+            friends = friendships.get(user_id)
+            if friends:
+                indices.extend(friends)  # already sorted
+            indptr[user_id + 1] = len(indices)
+        self._indptr = indptr
+        self._indices = indices
+        self._bitset_rows = build_bitset_rows(indptr, indices) if wants_bitset(n, len(indices)) else None
+        self._dirty = False
+        self._pending = 0
+
+    def freeze(self) -> Tuple[array, array]:
+        """
+        Build the CSR snapshot now (if stale) and return it as (indptr, indices).
+        Useful before batch analytics; the arrays must be treated as read-only
+        and become stale after the next mutation.
+        """
+        if self._dirty:
+            self._rebuild()
+        return self._indptr, self._indices
+
+    def _index_name(self, name: str, user_id: int) -> None:
+        """Add user_id under name, promoting a single ID to a tuple."""
+        current = self._name_index.get(name)
+        if current is None:
+            self._name_index[name] = user_id
+        elif isinstance(current, int):
+            self._name_index[name] = (current, user_id)
+        else:
+            self._name_index[name] = current + (user_id,)
+
+    def _unindex_name(self, name: str, user_id: int) -> None:
+        """Remove user_id from name, demoting a one-element tuple to an ID."""
+        current = self._name_index.get(name)
+        if current is None:
+            return
+        if isinstance(current, int):
+            if current == user_id:
+                del self._name_index[name]
+            return
+        rest = tuple(i for i in current if i != user_id)
+        self._name_index[name] = rest[0] if len(rest) == 1 else rest
+
+    def _store_profile(self, new_profile: UserProfile) -> None:
+        """Assign the next ID to a new profile and add it to every structure."""
+        user_id = self._next_id
+        self._next_id += 1
+
+        # assign id to profile object
+        new_profile.user_id = user_id
+
+        # store in structures
+        self._profiles[user_id] = new_profile
+        self._profile_by_key[new_profile] = new_profile
+        self._friendships[user_id] = array("i")
+        self._index_name(new_profile.name, user_id)  # interned copy
+
+    def _mark_changed(self, adjacency: bool = True, edits: int = 1) -> None:
+        """Invalidate cached suggestions (and the CSR snapshot and graph view if adjacency changed)."""
+        self._suggest_cache.clear()
+        if adjacency:
+            self._dirty = True
+            self._pending += edits
+            self._graph = None
+
+    def _friend_ids(self, user_id: int) -> array:
+        """Return the sorted friend IDs of user_id as a CSR row slice."""
+        if self._dirty:
+            self._rebuild()
+        return self._indices[self._indptr[user_id]:self._indptr[user_id + 1]]
+
     def profile_exists(self, target: UserProfile) -> bool:
         """Does a profile with same (name, email, phone) already exist?"""
-        return target in self._profile_set
+        return target in self._profile_by_key
 
     def find_profile_by_data(self, target: UserProfile) -> Optional[UserProfile]:
         """Search matching profile by equality (__eq__)."""
-        if target not in self._profile_set:
-            return None
-        for p in self._profile_set:
-            if p == target:
-                return p
-        return None
+        return self._profile_by_key.get(target)
 
     # ------------- CRUD: CREATE -------------
 
-    def add_profile(self, name: str, email: str = "", phone: str = "") -> Optional[UserProfile]:
+    def add_profile(self, name: str, email: str = "", phone: str = "") -> UserProfile:
         """
-        Create a new profile (vertex in the graph).
+        Create a new profile (vertex in the graph) and return it.
         Precondition: there is no profile with the same name + email + phone.
+        Raises ProfileExistsError if the precondition is violated.
         """
         new_profile = UserProfile(name, email, phone)
 
         if self.profile_exists(new_profile):
-            print("A profile with the same name/email/phone already exists.")
-            return None
+            raise ProfileExistsError(
+                f"A profile with the same name/email/phone already exists: {name!r}"
+            )
 
-        user_id = self._next_id
-        self._next_id += 1
+        self._store_profile(new_profile)
 
-        # assign id to profile object
-        new_profile.user_id = user_id
+        # new row in the CSR snapshot
+        self._mark_changed()
 
-        # store in structures
-        self._profiles[user_id] = new_profile
-        self._profile_set.add(new_profile)
-        self._friendships[user_id] = set()
-        self._name_index.setdefault(name, set()).add(user_id)
+        _log.debug("Profile created: id=%s, name='%s'", new_profile.user_id, name)
+        return new_profile
 
-        # graph vertex labeled by ID
-        self._graph.addVertex(user_id)
+    def add_profiles(self, entries: Iterable[Tuple[str, str, str]]) -> List[UserProfile]:
+        """
+        Create many profiles from (name, email, phone) tuples at once and
+        return the created profiles in input order. Exact duplicates, of
+        stored profiles or earlier entries, are skipped. Cached state is
+        invalidated once for the whole batch.
+        """
+        created = []
+        for name, email, phone in entries:
+            new_profile = UserProfile(name, email, phone)
+            if self.profile_exists(new_profile):
+                continue
+            self._store_profile(new_profile)
+            created.append(new_profile)
 
-        print(f"Profile created: id={user_id}, name='{name}'")
-        return new_profile
+        if created:
+            self._mark_changed(edits=len(created))
 
-    def add_friendship(self, profile1: UserProfile, profile2: UserProfile) -> None:
+        _log.debug("%s profiles created.", len(created))
+        return created
+
+    def add_friendship(self, profile1: UserProfile, profile2: UserProfile) -> bool:
         """
         Create a friendship (undirected edge between two profiles).
+        Returns True if it was created, False if the profiles were already friends.
         Precondition: profile1 != profile2 and both profiles belong to this network.
+        Raises ValueError if the precondition is violated.
         """
-        if profile1 not in self._profile_set or profile2 not in self._profile_set:
-            print("Both profiles must belong to this SocialNetwork.")
-            return
+        if profile1 not in self._profile_by_key or profile2 not in self._profile_by_key:
+            raise ValueError("Both profiles must belong to this SocialNetwork.")
 
         # Prevent self-friendship
         if profile1 == profile2:
-            print("A profile cannot be friends with itself.")
-            return
+            raise ValueError("A profile cannot be friends with itself.")
 
         id1 = profile1.user_id
         id2 = profile2.user_id
 
-        if profile1.user_id is None or profile2.user_id is None:
-            print("Both profiles must have valid IDs.")
-            return
+        if id1 is None or id2 is None:
+            raise ValueError("Both profiles must have valid IDs.")
 
         # Check if already friends
-        if id2 in self._friendships[id1]:
-            print("These profiles are already friends.")
-            return
+        friends1 = self._friendships[id1]
+        pos = bisect_left(friends1, id2)
+        if pos < len(friends1) and friends1[pos] == id2:
+            _log.warning("These profiles are already friends.")
+            return False
+
+        # Update friendships, keeping both arrays sorted
+        friends1.insert(pos, id2)
+        insort(self._friendships[id2], id1)
+        self._nnz += 2
 
-        # Update friendships
-        self._friendships[id1].add(id2)
-        self._friendships[id2].add(id1)
+        self._mark_changed()
 
-        # Update graph (IDs as vertex labels)
-        self._graph.addEdge(id1, id2, 1)
-        self._graph.addEdge(id2, id1, 1)
+        _log.debug("Friendship created between %s and %s.", id1, id2)
+        return True
 
-        print(f"Friendship created between {id1} and {id2}.")
+    def bulk_add_friendships(self, pairs: Iterable[Tuple[int, int]]) -> int:
+        """
+        Create many friendships from (user_id, user_id) pairs at once.
+        Invalid, self and duplicate pairs are skipped; (a, b) and (b, a) are
+        the same friendship. Each touched adjacency row is re-sorted once and
+        the CSR snapshot is rebuilt once, on the next read, instead of once
+        per edge.
+        Returns the number of friendships created.
+        """
+        friendships = self._friendships
+        # each friendship is seen once, as its canonical (low ID, high ID) edge
+        edges = set()
+        for id1, id2 in pairs:
+            if id1 == id2 or id1 not in friendships or id2 not in friendships:
+                continue
+            edges.add((id1, id2) if id1 < id2 else (id2, id1))
+
+        # collect the new friends of every touched user, then merge each row once
+        new_friends: Dict[int, List[int]] = {}
+        added = 0
+        for id1, id2 in edges:
+            friends1 = friendships[id1]
+            pos = bisect_left(friends1, id2)
+            if pos < len(friends1) and friends1[pos] == id2:
+                continue
+            new_friends.setdefault(id1, []).append(id2)
+            new_friends.setdefault(id2, []).append(id1)
+            added += 1
+
+        for user_id, ids in new_friends.items():
+            row = friendships[user_id]
+            row.extend(ids)
+            row[:] = array("i", sorted(row))
+
+        if added:
+            self._nnz += 2 * added
+            self._mark_changed(edits=added)
+
+        _log.debug("%s friendships created.", added)
+        return added
 
     # ------------- CRUD: READ -------------
 
@@ -172,18 +391,22 @@ class SocialNetwork:
         Return a list of all profiles with the given name.
         Returns an empty list if no matches are found.
         """
-        ids = sorted(self._name_index.get(name, set()))
-        return [self._profiles[i] for i in ids]
+        ids = self._name_index.get(name)
+        if ids is None:
+            return []
+        if isinstance(ids, int):
+            return [self._profiles[ids]]
+        return [self._profiles[i] for i in sorted(ids)]
 
     def get_friends(self, profile:UserProfile) -> List[UserProfile]:
         """
         Return a sorted list of friend profiles.
         Precondition: the profile belongs to this SocialNetwork.
         """
-        if profile.user_id is None or profile.user_id not in self._friendships:
+        user_id = profile.user_id
+        if user_id is None or user_id not in self._friendships:
             return []
-        friend_ids = sorted(self._friendships[profile.user_id])
-        return [self._profiles[i] for i in friend_ids]
+        return [self._profiles[i] for i in self._friendships[user_id]]
 
     def show_profile(self, name: str) -> None:
         """
@@ -196,55 +419,122 @@ class SocialNetwork:
             print("No profiles found with name:", name)
             return
 
+        # build the whole report, then write it once
+        lines: List[str] = []
         for profile in matches:
-            print(f"===== Profile (id={profile.user_id}) =====")
-            print(profile)
+            lines.append(f"===== Profile (id={profile.user_id}) =====")
+            lines.append(str(profile))
 
-            print("----- Friends -----")
+            lines.append("----- Friends -----")
             friends = self.get_friends(profile)
             if friends:
-                for f in friends:
-                    print(f"[id={f.user_id}] {f.name}")
+                lines.extend(f"[id={f.user_id}] {f.name}" for f in friends)
             else:
-                print("(no friends yet)")
+                lines.append("(no friends yet)")
 
-            print()  # spacing between profiles
+            lines.append("")  # spacing between profiles
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def show_all_profiles(self) -> None:
         """ Print all profiles in the network with their IDs."""
         if not self._profiles:
             print("No profiles in the network.")
             return
-        print("All profiles:")
-        for user_id in sorted(self._profiles):
-            p = self._profiles[user_id]
-            print(f" - id={user_id}, name={p.name}, email={p.email}, phone={p.phone}")
+        # _profiles is already in ID order, so no sort is needed
+        lines = ["All profiles:"]
+        for user_id, p in self._profiles.items():
+            lines.append(f" - id={user_id}, name={p.name}, email={p.email}, phone={p.phone}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
-    def suggest_friends(self, profile: UserProfile) -> List[UserProfile]:
+    def suggest_friends(
+            self,
+            profile: UserProfile,
+            k: Optional[int] = None,
+            sample_size: Optional[int] = None,
+    ) -> List[UserProfile]:
         """
         Return a list of friend profiles for the given profile.
+        If k is given, only the top k suggestions are returned.
+        If sample_size is given, only that many randomly chosen friends are
+        expanded, which bounds the cost for users with many friends; repeated
+        calls may then return different suggestions.
+        Full rankings are cached per user until the next mutation.
         Precondition: the profile belongs to this SocialNetwork.
+        Raises ValueError if k or sample_size is negative.
         """
+        if k is not None and k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        if sample_size is not None and sample_size < 0:
+            raise ValueError(f"sample_size must be non-negative, got {sample_size}")
+
         if profile.user_id is None or profile.user_id not in self._friendships:
             return []
 
         my_id = profile.user_id
-        direct_friends: Set[int] = self._friendships.get(my_id, set())
-        candidate_scores: Dict[int, int] = {}
-
-        for fid in direct_friends:
-            for fof_id in self._friendships.get(fid, set()):
-                if fof_id == my_id or fof_id in direct_friends:
-                    continue
-                candidate_scores[fof_id] = candidate_scores.get(fof_id, 0) + 1
-
-        # sort by mutual friend count desc, then by name
-        sorted_candidates: List[Tuple[int, int]] = sorted(
-            candidate_scores.items(),
-            key=lambda item: (-item[1], self._profiles[item[0]].name),
+        if sample_size is not None and len(self._friendships[my_id]) > sample_size:
+            # sampled rankings are random, so they bypass the cache
+            ranked = self._suggest_ids(my_id, k, sample_size)
+            return [self._profiles[user_id] for user_id in ranked]
+
+        cached = self._suggest_cache.get(my_id)
+        if cached is not None:
+            ranked = cached if k is None else cached[:k]
+        else:
+            ranked = self._suggest_ids(my_id, k)
+            if k is None:
+                self._suggest_cache[my_id] = ranked
+
+        return [self._profiles[user_id] for user_id in ranked]
+
+    def _suggest_ids(
+            self,
+            my_id: int,
+            k: Optional[int] = None,
+            sample_size: Optional[int] = None,
+    ) -> Tuple[int, ...]:
+        """Rank friends-of-friends of my_id by mutual friend count (top k if given)."""
+        # read the live adjacency unless a snapshot-only kernel would run and
+        # enough edits have piled up to be worth a full CSR rebuild
+        live = self._dirty and (
+            self._pending <= len(self._profiles) >> 3
+            or not wants_snapshot(self._next_id, self._nnz)
         )
-
-        return [self._profiles[user_id] for user_id, _ in sorted_candidates]
+        if live:
+            direct_friends = self._friendships[my_id]
+        else:
+            direct_friends = self._friend_ids(my_id)  # rebuilds the CSR snapshot if needed
+
+        expanded = None
+        if sample_size is not None and len(direct_friends) > sample_size:
+            expanded = random.sample(direct_friends, sample_size)
+
+        # mutual friend counts, excluding self and direct friends
+        if live:
+            candidate_scores = count_friends_of_friends_adjacency(
+                self._friendships, my_id, expanded
+            )
+        elif self._bitset_rows is not None:
+            candidate_scores = count_friends_of_friends_bitset(
+                self._bitset_rows, my_id, direct_friends if expanded is None else expanded
+            )
+        else:
+            candidate_scores = count_friends_of_friends(
+                self._indptr, self._indices, my_id, expanded
+            )
+
+        # sort by mutual friend count desc, then by name, then by ID;
+        # a bounded heap is O(C log k) when only the top k are wanted
+        profiles = self._profiles
+        def rank_key(item: Tuple[int, int]) -> Tuple[int, str, int]:
+            return -item[1], profiles[item[0]].name, item[0]
+
+        if k is None:
+            sorted_candidates = sorted(candidate_scores.items(), key=rank_key)
+        else:
+            sorted_candidates = heapq.nsmallest(k, candidate_scores.items(), key=rank_key)
+
+        return tuple(user_id for user_id, _ in sorted_candidates)
 
     # ------------- CRUD: UPDATE -------------
 
@@ -254,108 +544,117 @@ class SocialNetwork:
             new_name: Optional[str] = None,
             new_email: Optional[str] = None,
             new_phone: Optional[str] = None,
-    ) -> None:
+    ) -> bool:
         """
         Update profile data (name, email, phone) for the given user ID.
+        Returns False if there is no profile with that ID.
+        Raises ProfileExistsError, leaving the profile unchanged, if the
+        update would make it an exact duplicate of another profile.
 
         - Names are not required to be unique.
-        - Hash-based structures are updated safely before and after mutation.
+        - The hash-based profile map entry is swapped around the mutation;
+          an update that changes nothing touches no structure at all.
+        - Friendships are keyed by user ID, so a rename is O(1): no adjacency
+          entry or CSR row is touched.
         """
         profile = self._profiles.get(user_id)
         if profile is None:
-            print("Profile not found.")
-            return
+            _log.warning("Profile not found.")
+            return False
 
-        # Remove from hash-based set BEFORE changing hash fields.
-        self._profile_set.discard(profile)
+        # Nothing to do if no identifying field actually changes
+        old_name = profile.name
+        candidate = UserProfile(new_name or old_name, new_email or profile.email, new_phone or profile.phone)
+        if candidate == profile:
+            return True
+
+        # Same rule as add_profile: no two stored profiles may be equal
+        if candidate in self._profile_by_key:
+            raise ProfileExistsError(
+                f"A profile with the same name/email/phone already exists: {candidate.name!r}"
+            )
+
+        # Swap the hash-based map entry around the mutation of its key fields
+        self._profile_by_key.pop(profile, None)
+        profile.update(name=new_name, email=new_email, phone=new_phone)
+        self._profile_by_key[profile] = profile
 
         # Update name index if name changes
-        old_name = profile.name
         if new_name and new_name != old_name:
-            # remove from old name set
-            old_ids = self._name_index.get(old_name, set())
-            old_ids.discard(user_id)
-            if not old_ids:
-                self._name_index.pop(old_name, None)
-
-            # add to new name set
-            self._name_index.setdefault(new_name, set()).add(user_id)
-
-        # Update the profile's own data fields
-        profile.update(
-            name=new_name,
-            email=new_email,
-            phone=new_phone,
-        )
+            self._unindex_name(old_name, user_id)
+            self._index_name(profile.name, user_id)  # interned copy
 
-        # Re-add to hash-based set with updated hash
-        self._profile_set.add(profile)
+        # names break ties in suggestions, so cached rankings are stale
+        self._mark_changed(adjacency=False)
 
-        print(f"Profile updated: id={user_id}")
+        _log.debug("Profile updated: id=%s", user_id)
+        return True
 
     # ------------- CRUD: DELETE -------------
 
-    def remove_profile(self, user_id: int) -> None:
+    def remove_profile(self, user_id: int) -> bool:
         """
         Delete a profile (vertex) and all its friendships.
-        Must delete from hash set BEFORE deleting the profile.
-        Precondition: id exists in self._profiles.
+        Must delete from hash map BEFORE deleting the profile.
+        Returns False if there is no profile with that ID.
         """
         profile = self._profiles.get(user_id)
         if profile is None:
-            print("Profile not found.")
-            return
+            _log.warning("Profile not found.")
+            return False
 
-        # Remove from hash set first
-        self._profile_set.discard(profile)
+        # Remove from hash map first
+        self._profile_by_key.pop(profile, None)
 
-        # Remove from friends' lists
-        for friend_id in list(self._friendships.get(user_id, set())):
-            self._friendships[friend_id].discard(user_id)
-
-        # Remove from friendships map
-        self._friendships.pop(user_id, None)
+        # Remove from friendships map, then from friends' lists
+        friendships = self._friendships
+        friend_ids = friendships.pop(user_id, _EMPTY)
+        for friend_id in friend_ids:
+            friends = friendships[friend_id]
+            del friends[bisect_left(friends, user_id)]
+        self._nnz -= 2 * len(friend_ids)
 
         # Remove from profiles dict
         self._profiles.pop(user_id, None)
 
         # Remove from name index
-        name_ids = self._name_index.get(profile.name, set())
-        name_ids.discard(user_id)
-        if not name_ids:
-            self._name_index.pop(profile.name, None)
+        self._unindex_name(profile.name, user_id)
 
-        # Remove from graph (vertex is labeled by ID)
-        self._graph.removeVertex(user_id)
+        # every dropped friendship is an edit against the CSR snapshot
+        self._mark_changed(edits=max(1, len(friend_ids)))
 
-        print(f"Profile id={user_id} and all its friendships removed.")
+        _log.debug("Profile id=%s and all its friendships removed.", user_id)
+        return True
 
-    def remove_friendship(self, profile1: UserProfile, profile2: UserProfile) -> None:
+    def remove_friendship(self, profile1: UserProfile, profile2: UserProfile) -> bool:
         """
         Delete the friendship between two profiles.
-        Precondition: both profiles belong to this network and are friends.
+        Returns True if it was removed, False if the profiles were not friends.
+        Precondition: both profiles belong to this network.
+        Raises ValueError if the precondition is violated.
         """
-        if profile1.user_id is None or profile2.user_id is None:
-            print("Both profiles must have valid IDs.")
-            return
-
         id1 = profile1.user_id
         id2 = profile2.user_id
 
+        if id1 is None or id2 is None:
+            raise ValueError("Both profiles must have valid IDs.")
+
         if id1 not in self._profiles or id2 not in self._profiles:
-            print("Both profiles must belong to this SocialNetwork.")
-            return
+            raise ValueError("Both profiles must belong to this SocialNetwork.")
 
-        if id2 not in self._friendships.get(id1, set()):
-            print("These two profiles are not friends (or do not exist).")
-            return
+        friends1 = self._friendships[id1]
+        pos = bisect_left(friends1, id2)
+        if pos == len(friends1) or friends1[pos] != id2:
+            _log.warning("These two profiles are not friends.")
+            return False
 
         # Update adjacency structure
-        self._friendships[id1].remove(id2)
-        self._friendships[id2].remove(id1)
+        del friends1[pos]
+        friends2 = self._friendships[id2]
+        del friends2[bisect_left(friends2, id1)]
+        self._nnz -= 2
 
-        # Remove edges from the graph (IDs are vertex labels)
-        self._graph.removeEdge(id1, id2)
-        self._graph.removeEdge(id2, id1)
+        self._mark_changed()
 
-        print(f"Friendship removed between id={id1} and id={id2}.")
\ No newline at end of file
+        _log.debug("Friendship removed between id=%s and id=%s.", id1, id2)
+        return True
\ No newline at end of file
@@ -3,24 +3,33 @@ File: userprofile.py
 Author: Alexandra Yakovleva
 
 Defines the UserProfile class for the social network.
+Names are interned, so equal names share one string object and their
+dict lookups and comparisons short-circuit on identity.
 """
+import sys
 from typing import Any, Optional
 
 
 class UserProfile:
     """Represents a user's profile in the social network."""
 
+    __slots__ = ("name", "email", "phone", "user_id", "_hash", "_str")
+
     def __init__(self, name:str, email:str="", phone:str="", user_id: Optional[int] = None):
-        self.name = name
+        self.name = sys.intern(name)
         self.email = email
         self.phone = phone
         self.user_id = user_id  # assigned by SocialNetwork
+        self._hash: Optional[int] = None  # memoized by __hash__, reset by update()
+        self._str: Optional[str] = None  # memoized by __str__, reset by update()
 
 
     def update(self, name:str=None, email:str=None, phone:str=None) -> None:
         """Update fields that are not None."""
+        self._hash = None
+        self._str = None
         if name is not None and name != "":
-            self.name = name
+            self.name = sys.intern(name)
         if email is not None and email != "":
             self.email = email
         if phone is not None and phone != "":
@@ -28,8 +37,10 @@ class UserProfile:
 
     def __eq__(self, other: Any) -> bool:
         """Two UserProfiles are equal if all identifying fields are equal."""
+        if self is other:
+            return True
         if not isinstance(other, UserProfile):
-            return False
+            return NotImplemented
         return (
             self.name == other.name and
             self.email == other.email and
@@ -37,7 +48,9 @@ class UserProfile:
         )
     def __hash__(self) -> int:
        """Return a hash of the user's profile to be used with dicts and sets"""
-       return hash((self.name, self.email, self.phone))
+       if self._hash is None:
+           self._hash = hash((self.name, self.email, self.phone))
+       return self._hash
 
     def __repr__(self) -> str:
         """
@@ -51,7 +64,17 @@ class UserProfile:
     def __str__(self) -> str:
         """
         Return a string representation of the user's profile.
+        The text is built once and reused until the profile changes.
         """
+        if self._str is None:
+            if self.user_id is None:
+                # the ID is assigned later by SocialNetwork, so don't memoize yet
+                return self._format()
+            self._str = self._format()
+        return self._str
+
+    def _format(self) -> str:
+        """Build the text returned by __str__."""
         return (
             f"ID:    {self.user_id}\n"
             f"Name:  {self.name}\n"
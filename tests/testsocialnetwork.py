@@ -3,38 +3,165 @@ file: testsocialnetwork.py
 author: Alexandra Yakovleva
 Unit test for SocialNetwork
 """
+import importlib.util
+import random
+import sys
 import unittest
-from modules.socialnetwork import SocialNetwork
+from contextlib import ExitStack, contextmanager
+from typing import Iterable, Iterator, List
+from unittest import mock
+from modules.fofkernel import (
+    build_bitset_rows,
+    count_friends_of_friends,
+    count_friends_of_friends_adjacency,
+    count_friends_of_friends_bitset,
+)
+from modules.socialnetwork import ProfileExistsError, SocialNetwork
 from modules.userprofile import UserProfile
 
+# Profile data shared by the tests, as (name, email, phone)
+ALEX = tuple(map(sys.intern, ("Alex", "alex@wvc.edu", "408-555-0001")))
+BELLA = tuple(map(sys.intern, ("Bella", "bella@wvc.edu", "650-555-0002")))
+CARLOS = tuple(map(sys.intern, ("Carlos", "carlos@wvc.edu", "415-555-0003")))
+DIANA = tuple(map(sys.intern, ("Diana", "diana@wvc.edu", "408-555-0004")))
+EMIL = tuple(map(sys.intern, ("Emil", "emil@wvc.edu", "408-555-0005")))
+
 class TestSocialNetworkScenario(unittest.TestCase):
+    @staticmethod
+    def _names(profiles: Iterable[UserProfile]) -> List[str]:
+        """Sorted names of the given profiles."""
+        return sorted(p.name for p in profiles)
+
+    @staticmethod
+    @contextmanager
+    def _scoring_calls() -> Iterator[List[mock.MagicMock]]:
+        """Count calls into the FoF scoring kernels used by SocialNetwork."""
+        with ExitStack() as stack:
+            yield [stack.enter_context(mock.patch(f"modules.socialnetwork.{name}", wraps=kernel))
+                   for name, kernel in (
+                       ("count_friends_of_friends", count_friends_of_friends),
+                       ("count_friends_of_friends_adjacency", count_friends_of_friends_adjacency),
+                       ("count_friends_of_friends_bitset", count_friends_of_friends_bitset),
+                   )]
+
+    @staticmethod
+    def _adjacency_bitmap(net: SocialNetwork) -> int:
+        """
+        Pack the whole adjacency into one int: bit (i * n + j) is set if the
+        i-th and j-th stored profiles (by ID) are friends. Raises KeyError if
+        a friendship refers to a profile that is no longer stored.
+        """
+        ids = sorted(p.user_id for p in net.profile_set)
+        idx = {user_id: i for i, user_id in enumerate(ids)}
+        bits = 0
+        for user_id, friend_ids in net.friendships.items():
+            for friend_id in friend_ids:
+                bits |= 1 << (idx[user_id] * len(ids) + idx[friend_id])
+        return bits
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Build the shared baseline network once. Tests that use it must only
+        read from it; tests that mutate build their own SocialNetwork.
+        """
+        cls.base = base = SocialNetwork()
+        cls.alex, cls.bella, cls.carlos, cls.diana, cls.emil = base.add_profiles([
+            ALEX,
+            BELLA,
+            CARLOS,
+            DIANA,
+            EMIL,
+        ])
+
+        # Alex is friends with Bella and Carlos, who are both friends with Diana;
+        # Bella is also friends with Emil
+        for p1, p2 in [(cls.alex, cls.bella), (cls.alex, cls.carlos), (cls.bella, cls.diana),
+                       (cls.carlos, cls.diana), (cls.bella, cls.emil)]:
+            base.add_friendship(p1, p2)
+
     def test_userprofile_equality_and_hash(self) -> None:
         """Profiles are equal and hash-equal if name/email/phone match."""
-        p1 = UserProfile("Alex", "alex@wvc.edu", "408-555-0001")
-        p2 = UserProfile("Alex", "alex@wvc.edu", "408-555-0001")
+        p1 = UserProfile(*ALEX)
+        p2 = UserProfile(*ALEX)
         p3 = UserProfile("Alex", "alex2@wvc.edu", "408-555-0001")
 
         self.assertEqual(p1, p2)
         self.assertNotEqual(p1, p3)
+        self.assertNotEqual(p1, "Alex")
         self.assertEqual(hash(p1), hash(p2))
 
         s = {p1}
         self.assertIn(p2, s)
         self.assertNotIn(p3, s)
 
+        # The memoized hash follows an update of the key fields
+        p3.update(email="alex@wvc.edu")
+        self.assertEqual(hash(p3), hash(p1))
+        self.assertIn(p3, s)
+
+        # Subclasses compare and hash by the same fields
+        class Sub(UserProfile):
+            pass
+
+        a, b = Sub(*ALEX), Sub(*ALEX)
+        self.assertEqual(a, b)
+        self.assertEqual(a, p1)
+        self.assertEqual(len({a, b}), 1)
+
     def test_add_profile_and_reject_exact_duplicate(self) -> None:
         """Exact duplicate (same name+email+phone) is rejected."""
         net = SocialNetwork()
 
-        p1 = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        p2 = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")  # duplicate
+        p1 = net.add_profile(*ALEX)
+        with self.assertRaises(ProfileExistsError):
+            net.add_profile(*ALEX)  # duplicate
 
         self.assertIsInstance(p1, UserProfile)
-        self.assertIsNone(p2)
+        self.assertIs(net.find_profile_by_data(UserProfile(*ALEX)), p1)
+        self.assertIsNone(net.find_profile_by_data(UserProfile("Alex", "other@wvc.edu", "408-555-0001")))
 
         # Only one profile stored
-        self.assertEqual(len(net.profiles), 1)
-        self.assertEqual(len(net.profile_set), 1)
+        self.assertEqual(net.size, 1)
+
+    # (case, second profile added after Alex, whether it is accepted)
+    ADD_PROFILE_CASES = (
+        ("exact duplicate", ALEX, False),
+        ("same name, other email", ("Alex", "alex2@wvc.edu", "408-555-0001"), True),
+        ("same name, other phone", ("Alex", "alex@wvc.edu", "408-555-0009"), True),
+        ("other name, same contact", ("Alexa", "alex@wvc.edu", "408-555-0001"), True),
+    )
+
+    def test_add_profile_scenarios(self) -> None:
+        """Only a profile equal in all of name, email and phone is rejected."""
+        for case, entry, accepted in self.ADD_PROFILE_CASES:
+            with self.subTest(case=case):
+                net = SocialNetwork()
+                alex = net.add_profile(*ALEX)
+                if accepted:
+                    other = net.add_profile(*entry)
+                    self.assertNotEqual(other.user_id, alex.user_id)
+                else:
+                    with self.assertRaises(ProfileExistsError):
+                        net.add_profile(*entry)
+                self.assertEqual(net.size, 2 if accepted else 1)
+
+    def test_add_profiles_skips_duplicates(self) -> None:
+        """add_profiles creates profiles in order and skips exact duplicates."""
+        net = SocialNetwork()
+        alex = net.add_profile(*ALEX)
+
+        created = net.add_profiles([
+            BELLA,
+            ALEX,     # already stored
+            CARLOS,
+            BELLA,   # repeated in the batch
+        ])
+
+        self.assertEqual([p.name for p in created], ["Bella", "Carlos"])
+        self.assertEqual([p.user_id for p in created], [alex.user_id + 1, alex.user_id + 2])
+        self.assertEqual(net.size, 3)
+        self.assertEqual(net.find_profile("Carlos"), [created[1]])
 
     def test_duplicate_names_allowed(self) -> None:
         """Two different profiles with the same name but different data are allowed."""
@@ -49,75 +176,266 @@ class TestSocialNetworkScenario(unittest.TestCase):
         self.assertNotEqual(p1.user_id, p2.user_id)
 
         # Two profiles total, both named Alex
-        self.assertEqual(len(net.profiles), 2)
+        self.assertEqual(net.size, 2)
 
         alex_profiles = net.find_profile("Alex")
         self.assertEqual(len(alex_profiles), 2)
         self.assertEqual({p.email for p in alex_profiles},
                          {"alex_cs@wvc.edu", "alex_math@wvc.edu"})
 
+        # Removing one of them leaves the other findable by name
+        net.remove_profile(p1.user_id)
+        self.assertEqual(net.find_profile("Alex"), [p2])
+        net.remove_profile(p2.user_id)
+        self.assertEqual(net.find_profile("Alex"), [])
+
     def test_add_friendship_and_get_friends(self) -> None:
         """Friendships are mutual and returned correctly via get_friends()."""
         net = SocialNetwork()
 
-        alex = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        bella = net.add_profile("Bella", "bella@wvc.edu", "650-555-0002")
-        carlos = net.add_profile("Carlos", "carlos@wvc.edu", "415-555-0003")
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+        carlos = net.add_profile(*CARLOS)
 
-        assert isinstance(alex, UserProfile)
-        assert isinstance(bella, UserProfile)
-        assert isinstance(carlos, UserProfile)
-
-        net.add_friendship(alex, bella)
-        net.add_friendship(alex, carlos)
+        self.assertTrue(net.add_friendship(alex, bella))
+        self.assertTrue(net.add_friendship(alex, carlos))
+        with self.assertLogs("modules.socialnetwork", "WARNING") as logs:
+            self.assertFalse(net.add_friendship(bella, alex))  # already friends
+        self.assertEqual(logs.output, ["WARNING:modules.socialnetwork:These profiles are already friends."])
+        with self.assertRaises(ValueError):
+            net.add_friendship(alex, alex)
 
         alex_friends = net.get_friends(alex)
         bella_friends = net.get_friends(bella)
         carlos_friends = net.get_friends(carlos)
 
-        self.assertEqual({p.name for p in alex_friends}, {"Bella", "Carlos"})
-        self.assertEqual({p.name for p in bella_friends}, {"Alex"})
-        self.assertEqual({p.name for p in carlos_friends}, {"Alex"})
+        self.assertEqual(self._names(alex_friends), ["Bella", "Carlos"])
+        self.assertEqual(self._names(bella_friends), ["Alex"])
+        self.assertEqual(self._names(carlos_friends), ["Alex"])
+
+    def test_bulk_add_friendships(self) -> None:
+        """bulk_add_friendships adds valid pairs once and skips the rest."""
+        net = SocialNetwork()
+
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+        carlos = net.add_profile(*CARLOS)
+
+        added = net.bulk_add_friendships([
+            (alex.user_id, bella.user_id),
+            (bella.user_id, alex.user_id),    # duplicate
+            (alex.user_id, alex.user_id),     # self
+            (alex.user_id, 99),               # unknown ID
+            (carlos.user_id, bella.user_id),
+        ])
+
+        self.assertEqual(added, 2)
+        self.assertEqual(self._names(net.get_friends(alex)), ["Bella"])
+        self.assertEqual(self._names(net.get_friends(bella)), ["Alex", "Carlos"])
+        self.assertEqual(self._names(net.get_friends(carlos)), ["Bella"])
+
+    def test_freeze_builds_csr_snapshot(self) -> None:
+        """freeze() returns CSR arrays whose rows are the sorted friend IDs."""
+        net = SocialNetwork()
+
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+        carlos = net.add_profile(*CARLOS)
+
+        net.add_friendship(alex, carlos)
+        net.add_friendship(alex, bella)
+
+        indptr, indices = net.freeze()
+        rows = {u: list(indices[indptr[u]:indptr[u + 1]]) for u in net.profiles}
+        self.assertEqual(rows, {alex.user_id: [bella.user_id, carlos.user_id],
+                                bella.user_id: [alex.user_id],
+                                carlos.user_id: [alex.user_id]})
+
+    def test_bitset_scores_match_csr_scores(self) -> None:
+        """Bitset rows give the same mutual friend counts as the CSR kernel."""
+        net = SocialNetwork()
+        people = [net.add_profile(name) for name in ("Alex", "Bella", "Carlos", "Dana", "Eli", "Fay")]
+        for i, j in [(0, 1), (0, 2), (1, 2), (1, 3), (2, 3), (2, 4), (3, 5), (4, 5)]:
+            net.add_friendship(people[i], people[j])
+
+        indptr, indices = net.freeze()
+        rows = build_bitset_rows(indptr, indices)
+        for p in people:
+            friends = indices[indptr[p.user_id]:indptr[p.user_id + 1]]
+            self.assertEqual(count_friends_of_friends_bitset(rows, p.user_id, friends),
+                             dict(count_friends_of_friends(indptr, indices, p.user_id)))
+            self.assertEqual(count_friends_of_friends_bitset(rows, p.user_id, friends[:1]),
+                             dict(count_friends_of_friends(indptr, indices, p.user_id, friends[:1])))
+
+    def test_graph_view_is_rebuilt_after_changes(self) -> None:
+        """The graph property mirrors friendships as two directed edges each."""
+        net = SocialNetwork()
+
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+
+        net.add_friendship(alex, bella)
+        graph = net.graph
+        self.assertEqual(graph.sizeVertices(), 2)
+        self.assertEqual(graph.sizeEdges(), 2)
+        self.assertTrue(graph.containsEdge(alex.user_id, bella.user_id))
+        self.assertIs(net.graph, graph)
+
+        net.remove_friendship(alex, bella)
+        self.assertEqual(net.graph.sizeEdges(), 0)
 
     def test_suggest_friends_friends_of_friends(self) -> None:
         """suggest_friends uses friends-of-friends and counts mutual friends."""
+        net = self.base
+
+        # FoF for Alex: Diana (via Bella and Carlos) with count 2, then Emil (via Bella)
+        suggestions = net.suggest_friends(self.alex)
+        self.assertEqual([p.name for p in suggestions], ["Diana", "Emil"])
+
+        # FoF for Diana: Alex (via Bella and Carlos) with count 2, then Emil (via Bella)
+        self.assertEqual([p.name for p in net.suggest_friends(self.diana)], ["Alex", "Emil"])
+
+    def test_suggest_friends_top_k(self) -> None:
+        """suggest_friends(k=...) returns only the best k candidates, in rank order."""
+        net, alex = self.base, self.alex
+
+        self.assertEqual([p.name for p in net.suggest_friends(alex, k=1)], ["Diana"])
+        self.assertEqual([p.name for p in net.suggest_friends(alex)], ["Diana", "Emil"])
+        self.assertEqual([p.name for p in net.suggest_friends(alex, k=1)], ["Diana"])
+
+        # negative limits are rejected, whether or not the ranking is cached
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                net.suggest_friends(alex, k=-1)
+        with self.assertRaises(ValueError):
+            net.suggest_friends(alex, sample_size=-1)
+
+        # expanding one sampled friend yields that friend's other friends only
+        for _ in range(10):
+            names = {p.name for p in net.suggest_friends(alex, sample_size=1)}
+            self.assertIn(names, ({"Diana", "Emil"}, {"Diana"}))
+
+    @unittest.skipUnless(importlib.util.find_spec("numba"), "numba is not installed")
+    def test_suggest_friends_large_with_numba_kernel(self) -> None:
+        """The compiled CSR kernel agrees with the adjacency counts on a large graph."""
+        rng = random.Random(7)
         net = SocialNetwork()
+        people = net.add_profiles((f"User{i:05d}", "", "") for i in range(10_000))
+
+        # preferential attachment: each new user befriends 3 users picked by degree
+        ends = [p.user_id for p in people[:4]]
+        pairs = [(a, b) for a in ends for b in ends if a < b]
+        for p in people[4:]:
+            targets = {rng.choice(ends) for _ in range(3)}
+            pairs.extend((p.user_id, t) for t in targets)
+            ends.extend(targets)
+            ends.extend([p.user_id] * len(targets))
+        net.bulk_add_friendships(pairs)
+
+        indptr, indices = net.freeze()
+        for p in rng.sample(people, 50):
+            expected = dict(count_friends_of_friends_adjacency(net.friendships, p.user_id))
+            self.assertEqual(count_friends_of_friends(indptr, indices, p.user_id), expected)
+            self.assertEqual({s.user_id for s in net.suggest_friends(p)}, set(expected))
+
+    def test_suggest_friends_defers_rebuild_for_few_edits(self) -> None:
+        """Up to V/8 edits after freeze() are scored live; past that the snapshot is rebuilt."""
+        entries = [(f"User{i:02d}", "", "") for i in range(16)]
+        # each user befriends the next three: dense enough for a snapshot-only kernel
+        base = [(i, (i + d) % 16) for i in range(16) for d in (1, 2, 3)]
+        extra = [(0, 8), (1, 9), (2, 10)]  # 16 users, so at most 2 edits are deferred
 
-        alex = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        bella = net.add_profile("Bella", "bella@wvc.edu", "650-555-0002")
-        carlos = net.add_profile("Carlos", "carlos@wvc.edu", "415-555-0003")
-        diana = net.add_profile("Diana", "diana@wvc.edu", "408-555-0004")
+        net = SocialNetwork()
+        people = net.add_profiles(entries)
+        net.bulk_add_friendships((people[i].user_id, people[j].user_id) for i, j in base)
+        net.freeze()
+
+        with self._scoring_calls() as (csr, adjacency, bitset):
+            for edit, (i, j) in enumerate(extra, start=1):
+                net.add_friendship(people[i], people[j])
+                for kernel in (csr, adjacency, bitset):
+                    kernel.reset_mock()
+                net.suggest_friends(people[0])
+                if edit <= 2:
+                    self.assertTrue(adjacency.called)
+                    self.assertFalse(csr.called or bitset.called)
+                else:
+                    self.assertFalse(adjacency.called)
+                    self.assertTrue(csr.called or bitset.called)  # bitset, or CSR with Numba
+
+        # rankings match a network built from scratch with the same edges
+        fresh = SocialNetwork()
+        fresh_people = fresh.add_profiles(entries)
+        fresh.bulk_add_friendships((fresh_people[i].user_id, fresh_people[j].user_id)
+                                   for i, j in base + extra)
+        for p, fresh_p in zip(people, fresh_people):
+            self.assertEqual([s.name for s in net.suggest_friends(p)],
+                             [s.name for s in fresh.suggest_friends(fresh_p)])
+
+    def test_random_networks_keep_invariants(self) -> None:
+        """Seeded random networks: duplicates, friendship symmetry and FoF ranking."""
+        for seed in range(25):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                net = SocialNetwork()
+
+                # a small value pool makes exact duplicates likely
+                entries = [(rng.choice("ABCD"), rng.choice(("", "a@wvc.edu", "b@wvc.edu")),
+                            rng.choice(("", "408-555-0001"))) for _ in range(rng.randint(1, 20))]
+                for entry in entries:
+                    try:
+                        net.add_profile(*entry)
+                    except ProfileExistsError:
+                        self.assertIsNotNone(net.find_profile_by_data(UserProfile(*entry)))
+                self.assertEqual(net.size, len(set(entries)))
+
+                ids = list(net.profiles)
+                if len(ids) > 1:
+                    net.bulk_add_friendships(tuple(rng.sample(ids, 2)) for _ in range(rng.randint(0, 30)))
+                adjacency = {u: {f.user_id for f in net.get_friends(net.profiles[u])} for u in ids}
+                for u, friends in adjacency.items():
+                    self.assertNotIn(u, friends)
+                    for f in friends:
+                        self.assertIn(u, adjacency[f])
+
+                # reference ranking: mutual friend count desc, then name, then ID
+                for u in ids:
+                    scores = {}
+                    for f in adjacency[u]:
+                        for c in adjacency[f] - adjacency[u] - {u}:
+                            scores[c] = scores.get(c, 0) + 1
+                    expected = sorted(scores, key=lambda c: (-scores[c], net.profiles[c].name, c))
+                    self.assertEqual([p.user_id for p in net.suggest_friends(net.profiles[u])], expected)
+
+    def test_suggest_friends_cache_invalidated_on_mutation(self) -> None:
+        """Cached suggestions are recomputed after the network changes."""
+        net = SocialNetwork()
 
-        assert isinstance(alex, UserProfile)
-        assert isinstance(bella, UserProfile)
-        assert isinstance(carlos, UserProfile)
-        assert isinstance(diana, UserProfile)
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+        carlos = net.add_profile(*CARLOS)
 
-        # Alex is friends with Bella and Carlos
         net.add_friendship(alex, bella)
-        net.add_friendship(alex, carlos)
+        net.add_friendship(bella, carlos)
 
-        # Bella and Carlos are both friends with Diana
-        net.add_friendship(bella, diana)
-        net.add_friendship(carlos, diana)
+        self.assertEqual([p.name for p in net.suggest_friends(alex)], ["Carlos"])
+        self.assertEqual([p.name for p in net.suggest_friends(alex)], ["Carlos"])
 
-        # FoF for Alex: Diana (via Bella and Carlos) with count 2
-        suggestions = net.suggest_friends(alex)
-        self.assertEqual(len(suggestions), 1)
-        self.assertEqual(suggestions[0].name, "Diana")
+        net.add_friendship(alex, carlos)
+        self.assertEqual(net.suggest_friends(alex), [])
 
     def test_update_profile_changes_name_and_index_and_hashset(self) -> None:
         """update_profile updates name, name index, and keeps _profile_set consistent."""
         net = SocialNetwork()
 
-        alex = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        assert isinstance(alex, UserProfile)
+        alex = net.add_profile(*ALEX)
         user_id = alex.user_id
         assert user_id is not None
 
         # Initially, Alex is under name "Alex"
         self.assertEqual({p.user_id for p in net.find_profile("Alex")}, {user_id})
         self.assertEqual(net.find_profile("Alexa"), [])
+        self.assertIn("Name:  Alex\n", str(alex))
 
         # Update name and email
         net.update_profile(user_id, new_name="Alexa", new_email="alexa@wvc.edu")
@@ -132,53 +450,109 @@ class TestSocialNetworkScenario(unittest.TestCase):
         self.assertEqual(alexa.name, "Alexa")
         self.assertEqual(alexa.email, "alexa@wvc.edu")
         self.assertEqual(alexa.user_id, user_id)
+        self.assertIn("Name:  Alexa\n", str(alexa))
 
         # _profile_set should still contain exactly one profile equal to alexa
         self.assertIn(alexa, net.profile_set)
-        self.assertEqual(len(net.profile_set), 1)
+        self.assertEqual(net.size, 1)
+
+        # A no-op update leaves the cached ranking in place, a real one does not
+        net.suggest_friends(alexa)
+        with self._scoring_calls() as kernels:
+            self.assertTrue(net.update_profile(user_id, new_name="Alexa", new_phone=""))
+            net.suggest_friends(alexa)
+            self.assertFalse(any(kernel.called for kernel in kernels))
+
+            self.assertTrue(net.update_profile(user_id, new_phone="408-555-0009"))
+            net.suggest_friends(alexa)
+            self.assertTrue(any(kernel.called for kernel in kernels))
+
+    def test_update_profile_rejects_exact_duplicate(self) -> None:
+        """An update that would copy another profile exactly is rejected and changes nothing."""
+        net = SocialNetwork()
+        alex = net.add_profile(*ALEX)
+        alexa = net.add_profile("Alexa", "alex@wvc.edu", "408-555-0001")
+
+        with self.assertRaises(ProfileExistsError):
+            net.update_profile(alexa.user_id, new_name="Alex")
+
+        self.assertEqual(alexa.name, "Alexa")
+        self.assertEqual(net.size, 2)
+        self.assertEqual(net.find_profile("Alexa"), [alexa])
+        self.assertEqual(net.find_profile("Alex"), [alex])
+
+        # both profiles are still fully usable after the other one is removed
+        net.remove_profile(alex.user_id)
+        self.assertIn(alexa, net.profile_set)
+        self.assertTrue(net.add_friendship(alexa, net.add_profile(*BELLA)))
+
+    def test_update_profile_rename_keeps_friendships(self) -> None:
+        """Renaming a profile leaves its friendships and the CSR snapshot intact."""
+        net = SocialNetwork()
+
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
+
+        net.add_friendship(alex, bella)
+        self.assertEqual(self._names(net.get_friends(bella)), ["Alex"])
+        indptr, indices = net.freeze()
+
+        net.update_profile(alex.user_id, new_name="Alexa")
+
+        # the snapshot is still current, so freeze() hands back the same arrays
+        frozen = net.freeze()
+        self.assertIs(frozen[0], indptr)
+        self.assertIs(frozen[1], indices)
+        self.assertEqual(self._names(net.get_friends(bella)), ["Alexa"])
+        self.assertEqual(self._names(net.get_friends(alex)), ["Bella"])
 
     def test_remove_profile_cleans_friendships_and_indexes(self) -> None:
         """remove_profile deletes the profile and all references from friendship and name index."""
         net = SocialNetwork()
 
-        alex = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        bella = net.add_profile("Bella", "bella@wvc.edu", "650-555-0002")
-
-        assert isinstance(alex, UserProfile)
-        assert isinstance(bella, UserProfile)
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
 
         net.add_friendship(alex, bella)
 
         # Sanity check
-        self.assertEqual({p.name for p in net.get_friends(alex)}, {"Bella"})
-        self.assertEqual({p.name for p in net.get_friends(bella)}, {"Alex"})
+        self.assertEqual(self._names(net.get_friends(alex)), ["Bella"])
+        self.assertEqual(self._names(net.get_friends(bella)), ["Alex"])
 
         # Remove Bella
-        net.remove_profile(bella.user_id)
+        self.assertTrue(net.remove_profile(bella.user_id))
+        with self.assertLogs("modules.socialnetwork", "WARNING") as logs:
+            self.assertFalse(net.remove_profile(bella.user_id))  # already gone
+        self.assertEqual(logs.output, ["WARNING:modules.socialnetwork:Profile not found."])
 
         # Bella is gone
         self.assertEqual(len(net.find_profile("Bella")), 0)
         self.assertNotIn(bella, net.profile_set)
 
-        # Alex now has no friends
+        # Alex now has no friends, and no friendship is left anywhere
         self.assertEqual(net.get_friends(alex), [])
+        self.assertEqual(self._adjacency_bitmap(net), 0)
+
+        # _profiles stays in ascending ID order after removals
+        net.add_profile(*CARLOS)
+        self.assertEqual(list(net.profiles), sorted(net.profiles))
 
     def test_remove_friendship(self) -> None:
         """remove_friendship removes the edge and updates adjacency."""
         net = SocialNetwork()
 
-        alex = net.add_profile("Alex", "alex@wvc.edu", "408-555-0001")
-        bella = net.add_profile("Bella", "bella@wvc.edu", "650-555-0002")
-
-        assert isinstance(alex, UserProfile)
-        assert isinstance(bella, UserProfile)
+        alex = net.add_profile(*ALEX)
+        bella = net.add_profile(*BELLA)
 
         net.add_friendship(alex, bella)
 
-        self.assertEqual({p.name for p in net.get_friends(alex)}, {"Bella"})
-        self.assertEqual({p.name for p in net.get_friends(bella)}, {"Alex"})
+        self.assertEqual(self._names(net.get_friends(alex)), ["Bella"])
+        self.assertEqual(self._names(net.get_friends(bella)), ["Alex"])
 
-        net.remove_friendship(alex, bella)
+        self.assertTrue(net.remove_friendship(alex, bella))
+        with self.assertLogs("modules.socialnetwork", "WARNING") as logs:
+            self.assertFalse(net.remove_friendship(alex, bella))  # no longer friends
+        self.assertEqual(logs.output, ["WARNING:modules.socialnetwork:These two profiles are not friends."])
 
         self.assertEqual(net.get_friends(alex), [])
         self.assertEqual(net.get_friends(bella), [])